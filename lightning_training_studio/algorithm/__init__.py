@@ -1,3 +1,3 @@
-from lightning_training_studio.algorithm.optuna import GridSearch, OptunaAlgorithm, RandomSearch
+from lightning_training_studio.algorithm.optuna import ASHAPruner, GridSearch, OptunaAlgorithm, RandomSearch
 
-__all__ = ["OptunaAlgorithm", "GridSearch", "RandomSearch"]
+__all__ = ["OptunaAlgorithm", "ASHAPruner", "GridSearch", "RandomSearch"]
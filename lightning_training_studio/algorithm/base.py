@@ -1,21 +1,36 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from lightning_training_studio.commands.sweep.run import ExperimentConfig
 
 
 class Algorithm(ABC):
+    # Reports accumulated by the default `should_prune_step`, created on first use.
+    _reports_history: Optional[Dict[int, List[Tuple[float, int]]]] = None
+
     @abstractmethod
     def register_distributions(self, distributions):
         ...
 
     @abstractmethod
-    def register_experiments(self, experiments: List[ExperimentConfig]):
+    def register_experiments(self, experiments: Iterable[ExperimentConfig]):
         ...
 
     @abstractmethod
-    def experiment_start(self, experiment_id: int):
-        ...
+    def experiment_start(self, experiment_id: int, params: Optional[Dict[str, Any]] = None):
+        """Start an experiment. ``params`` are given when a resumed experiment already runs with them."""
+
+    def batched_experiment_start(
+        self, experiment_ids: List[int], params: Optional[Dict[int, Dict[str, Any]]] = None
+    ) -> Dict[int, Dict[str, Any]]:
+        """Start all the experiments launched within the same tick and return their params.
+
+        The default starts them one at a time, algorithms able to share work across the batch can override it.
+        """
+        params = params or {}
+        for experiment_id in experiment_ids:
+            self.experiment_start(experiment_id, params.get(experiment_id))
+        return {experiment_id: self.get_params(experiment_id) for experiment_id in experiment_ids}
 
     @abstractmethod
     def experiment_end(self, experiment_id: int, score: float):
@@ -25,6 +40,22 @@ class Algorithm(ABC):
     def should_prune(self, experiment_id: int, reports: List[float]) -> bool:
         ...
 
+    def should_prune_step(self, experiment_id: int, step: int, value: float) -> bool:
+        """Called once for each new report of an experiment, in order.
+
+        By default, the reports received so far are accumulated and handed to ``should_prune``.
+        """
+        if self._reports_history is None:
+            self._reports_history = {}
+        reports = self._reports_history.setdefault(experiment_id, [])
+        reports.append((value, step))
+        return self.should_prune(experiment_id, reports)
+
+    def experiment_released(self, experiment_id: int) -> None:
+        """Called once an experiment ended, whatever its outcome, to free what was kept for it."""
+        if self._reports_history is not None:
+            self._reports_history.pop(experiment_id, None)
+
     @abstractmethod
     def get_params(self, experiment_id: int) -> Dict[str, Any]:
         ...
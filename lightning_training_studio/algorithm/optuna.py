@@ -1,5 +1,10 @@
 import logging
-from typing import Any, Dict, List, Optional, Tuple
+import os
+import sqlite3
+import urllib.parse
+from bisect import insort
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
 import optuna
 from lightning_utilities.core.apply_func import apply_to_collection
@@ -11,6 +16,10 @@ from optuna.distributions import (
     LogUniformDistribution,
     UniformDistribution,
 )
+from optuna.storages import BaseStorage, RDBStorage
+from optuna.study import StudyDirection
+from optuna.trial import TrialState
+from sqlalchemy import event
 
 from lightning_training_studio.algorithm.base import Algorithm
 from lightning_training_studio.distributions import DistributionDict
@@ -25,36 +34,110 @@ _DISTRIBUTION_TO_OPTUNA = {
     "categorical": CategoricalDistribution,
 }
 
+_REGISTER_CHUNK_SIZE = 256
+
+_STUDY_STORAGE_DIR = ".lhpo"
+
+
+def _set_sqlite_pragmas(dbapi_connection, _) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+def _sqlite_storage_path(sweep_id: str) -> str:
+    # Sweep ids are user provided, quoting keeps them from escaping the storage directory.
+    return os.path.join(_STUDY_STORAGE_DIR, f"{urllib.parse.quote_plus(sweep_id)}.db")
+
+
+def _sqlite_storage(sweep_id: str) -> RDBStorage:
+    """Returns a storage backed by a process-local SQLite file, so a restarted sweep resumes its study."""
+    os.makedirs(_STUDY_STORAGE_DIR, exist_ok=True)
+    path = _sqlite_storage_path(sweep_id)
+
+    # The journal mode is persisted in the database file, unlike the synchronous flag set on every connection.
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.close()
+
+    storage = RDBStorage(f"sqlite:///{path}")
+    event.listen(storage.engine, "connect", _set_sqlite_pragmas)
+    storage.engine.dispose()
+    return storage
+
+
+def _delete_sqlite_storage(sweep_id: str) -> None:
+    path = _sqlite_storage_path(sweep_id)
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def _compile_distributions(distributions: Dict[str, DistributionDict]) -> Dict[str, BaseDistribution]:
+    # Parsed once at registration, `study.ask` then reuses the Optuna objects for every experiment.
+    return {
+        var_name: _DISTRIBUTION_TO_OPTUNA[distribution["distribution"]](**distribution["params"])
+        for var_name, distribution in distributions.items()
+    }
+
+
+def _add_experiments(
+    study: Study, distributions: Dict[str, BaseDistribution], experiments_config: Iterable[Dict]
+) -> None:
+    # Consume the experiments lazily so a resumed sweep never holds them all as trials at once.
+    experiments_config = iter(experiments_config)
+    while True:
+        chunk = list(islice(experiments_config, _REGISTER_CHUNK_SIZE))
+        if not chunk:
+            return
+        study.add_trials(
+            optuna.trial.create_trial(
+                params=experiment_config["params"],
+                distributions=distributions,
+                value=experiment_config["best_model_score"],
+            )
+            for experiment_config in chunk
+        )
+
 
 class OptunaAlgorithm(Algorithm):
-    def __init__(self, study: Optional[Study] = None, direction: Optional[str] = "minimize") -> None:
-        self.study = study or create_study(direction=direction)
+    def __init__(
+        self,
+        study: Optional[Study] = None,
+        direction: Optional[str] = "minimize",
+        storage: Optional[Union[str, BaseStorage]] = None,
+        study_name: Optional[str] = None,
+    ) -> None:
+        self.study = study or create_study(
+            direction=direction, storage=storage, study_name=study_name, load_if_exists=storage is not None
+        )
+        if study is None and direction and self.study.direction != StudyDirection[direction.upper()]:
+            raise ValueError(
+                f"The study `{self.study.study_name}` was created to {self.study.direction.name.lower()}, "
+                f"it can't be resumed to {direction}."
+            )
         self.experiments: Dict[int, Trial] = {}
         self.reports = {}
         self.distributions: Dict[str, BaseDistribution] = {}
 
     def register_distributions(self, distributions: Dict[str, DistributionDict]):
-        for var_name, distribution in distributions.items():
-            distribution_cls = _DISTRIBUTION_TO_OPTUNA[distribution["distribution"]]
-            distribution = distribution_cls(**distribution["params"])
-            self.distributions[var_name] = distribution
-
-    def register_experiments(self, experiments_config: List[Dict]) -> None:
-        for experiment_config in experiments_config:
-            trial = optuna.trial.create_trial(
-                params=experiment_config["params"],
-                distributions=self.distributions,
-                value=experiment_config["best_model_score"],
-            )
-            self.study.add_trial(trial)
+        self.distributions.update(_compile_distributions(distributions))
 
-    def experiment_start(self, experiment_id: int) -> None:
+    def register_experiments(self, experiments_config: Iterable[Dict]) -> None:
+        # A study resumed from its storage already holds the experiments which succeeded before the restart.
+        num_completed = len(self.study.get_trials(deepcopy=False, states=(TrialState.COMPLETE,)))
+        _add_experiments(self.study, self.distributions, islice(experiments_config, num_completed, None))
+
+    def experiment_start(self, experiment_id: int, params: Optional[Dict[str, Any]] = None) -> None:
         if experiment_id not in self.experiments:
+            if params:
+                # Fix the trial to the params the resumed experiment runs with, so its score is told to them.
+                self.study.enqueue_trial(params)
             self.experiments[experiment_id] = self.study.ask(self.distributions)
 
     def experiment_end(self, experiment_id: int, score: float):
         try:
-            self.study.tell(experiment_id, score)
+            self.study.tell(self.experiments[experiment_id], score)
         except RuntimeError as e:
             # The trial has already been added to the study.
             print(e)
@@ -82,6 +165,14 @@ class OptunaAlgorithm(Algorithm):
 
         return False
 
+    def should_prune_step(self, experiment_id: int, step: int, value: float) -> bool:
+        trial = self.experiments[experiment_id]
+        trial.report(value, step)
+        if trial.should_prune():
+            _logger.info(f"Trial {experiment_id} pruned.")
+            return True
+        return False
+
     def get_params(self, experiment_id: int) -> Dict[str, Any]:
         params = self.experiments[experiment_id].params
         out = {}
@@ -93,6 +184,64 @@ class OptunaAlgorithm(Algorithm):
         return out
 
 
+class ASHAPruner(OptunaAlgorithm):
+    """Optuna sampling with Asynchronous Successive Halving pruning.
+
+    An experiment is only compared to the others when its number of reports reaches a rung ``min_r * eta**i``.
+    It is kept if its report ranks within the top ``1 / eta`` of the values recorded at that rung.
+    """
+
+    def __init__(
+        self,
+        eta: int = 3,
+        min_r: int = 1,
+        max_r: int = 81,
+        study: Optional[Study] = None,
+        direction: Optional[str] = "minimize",
+        storage: Optional[Union[str, BaseStorage]] = None,
+        study_name: Optional[str] = None,
+    ) -> None:
+        super().__init__(study=study, direction=direction, storage=storage, study_name=study_name)
+        self.eta = eta
+        self.min_r = min_r
+        self.max_r = max_r
+        self.rung_steps: List[int] = []
+        step = min_r
+        while step <= max_r:
+            self.rung_steps.append(step)
+            step *= eta
+        # Sorted so that the best value comes first, whatever the study direction.
+        self.rungs: List[List[float]] = [[] for _ in self.rung_steps]
+        self.num_reports: Dict[int, int] = {}
+        self._sign = -1 if self.study.direction == StudyDirection.MAXIMIZE else 1
+
+    def should_prune(self, experiment_id: int, reports: List[Tuple[float, int]]) -> bool:
+        last_num_reports = self.num_reports.get(experiment_id, 0)
+        for value, step in reports[last_num_reports:]:
+            if self.should_prune_step(experiment_id, step, value):
+                return True
+        return False
+
+    def should_prune_step(self, experiment_id: int, step: int, value: float) -> bool:
+        num_reports = self.num_reports.get(experiment_id, 0) + 1
+        self.num_reports[experiment_id] = num_reports
+
+        if num_reports in self.rung_steps:
+            rung = self.rung_steps.index(num_reports)
+            if not self._promote(rung, value):
+                _logger.info(f"Trial {experiment_id} pruned at rung {rung}.")
+                return True
+
+        return False
+
+    def _promote(self, rung: int, value: float) -> bool:
+        scores = self.rungs[rung]
+        score = self._sign * value
+        insort(scores, score)
+        promotable_idx = max(len(scores) // self.eta - 1, 0)
+        return score <= scores[promotable_idx]
+
+
 class GridSearch(Algorithm):
     def __init__(self, search_space: Dict[str, Any]):
         sampler = optuna.samplers.GridSampler(search_space)
@@ -105,10 +254,10 @@ class GridSearch(Algorithm):
     def total_experiments(self) -> int:
         return len(self.experiments)
 
-    def experiment_start(self, experiment_id: int) -> None:
+    def experiment_start(self, experiment_id: int, params: Optional[Dict[str, Any]] = None) -> None:
         pass
 
-    def register_experiments(self, experiments_config: List[Dict]) -> None:
+    def register_experiments(self, experiments_config: Iterable[Dict]) -> None:
         pass
 
     def register_distributions(self, distributions):
@@ -120,6 +269,9 @@ class GridSearch(Algorithm):
     def should_prune(self) -> bool:
         return False
 
+    def should_prune_step(self, experiment_id: int, step: int, value: float) -> bool:
+        return False
+
     def experiment_end(self, experiment_id: int, score: float):
         pass
 
@@ -129,26 +281,16 @@ class RandomSearch(Algorithm):
         self.study = create_study(sampler=optuna.samplers.RandomSampler())
         self.distributions = {}
         distributions = apply_to_collection(distributions, Distribution, lambda x: x.to_dict())
-        self._register_distributions(distributions)
+        self.distributions.update(_compile_distributions(distributions))
         self.experiments = {}
 
-    def _register_distributions(self, distributions: Dict[str, DistributionDict]):
-        for var_name, distribution in distributions.items():
-            distribution_cls = _DISTRIBUTION_TO_OPTUNA[distribution["distribution"]]
-            distribution = distribution_cls(**distribution["params"])
-            self.distributions[var_name] = distribution
-
-    def experiment_start(self, experiment_id: int) -> None:
+    def experiment_start(self, experiment_id: int, params: Optional[Dict[str, Any]] = None) -> None:
+        if params:
+            self.study.enqueue_trial(params)
         self.experiments[experiment_id] = self.study.ask(self.distributions)
 
-    def register_experiments(self, experiments_config: List[Dict]) -> None:
-        for experiment_config in experiments_config:
-            trial = optuna.trial.create_trial(
-                params=experiment_config["params"],
-                distributions=self.distributions,
-                value=experiment_config["best_model_score"],
-            )
-            self.study.add_trial(trial)
+    def register_experiments(self, experiments_config: Iterable[Dict]) -> None:
+        _add_experiments(self.study, self.distributions, experiments_config)
 
     def register_distributions(self, distributions):
         pass
@@ -168,5 +310,8 @@ class RandomSearch(Algorithm):
     def should_prune(self) -> bool:
         return False
 
+    def should_prune_step(self, experiment_id: int, step: int, value: float) -> bool:
+        return False
+
     def experiment_end(self, experiment_id: int, score: float):
         pass
@@ -328,7 +328,7 @@ class RunSweepCommand(ClientCommand):
             default="grid_search",
             type=str,
             help="The search algorithm to use.",
-            choices=["grid_search", "random_search", "bayesian"],
+            choices=["grid_search", "random_search", "bayesian", "asha"],
         )
         parser.add_argument("--total_experiments", default=None, type=int, help="The total number of experiments")
         parser.add_argument("--parallel_experiments", default=None, type=int, help="Number of experiments to run.")
@@ -1,10 +1,13 @@
+import gc
 import os
+import secrets
 import time
-import uuid
-from typing import Any, Dict, List, Optional, Tuple, Type, Union
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple, Type, Union
 from uuid import uuid4
 
 from lightning import BuildConfig, CloudCompute, LightningFlow, LightningWork
+from lightning.app import structures
 from lightning.app.components.python.tracer import Code
 from lightning.app.frontend import StaticWebFrontend
 from lightning.app.storage.mount import Mount
@@ -13,22 +16,29 @@ from lightning.app.utilities.app_helpers import _LightningAppRef
 from lightning_utilities.core.apply_func import apply_to_collection
 
 from lightning_training_studio.algorithm.base import Algorithm
-from lightning_training_studio.algorithm.optuna import GridSearch, OptunaAlgorithm, RandomSearch
+from lightning_training_studio.algorithm.optuna import (
+    _sqlite_storage,
+    ASHAPruner,
+    GridSearch,
+    OptunaAlgorithm,
+    RandomSearch,
+)
 from lightning_training_studio.commands.sweep.run import ExperimentConfig, SweepConfig
 from lightning_training_studio.commands.sweep.show import ShowSweepsCommand
 from lightning_training_studio.controllers.controller import ControllerResource
 from lightning_training_studio.distributions.distributions import Distribution
 from lightning_training_studio.framework.agnostic import Objective
-from lightning_training_studio.loggers import LoggerType
 from lightning_training_studio.utilities.enum import Stage
 from lightning_training_studio.utilities.utils import (
-    _check_stage,
+    _get_stages,
+    _resolve_logger_cls,
     _resolve_objective_cls,
-    get_best_model_path,
-    get_best_model_score,
     HPOCloudCompute,
 )
 
+_FINISHED_STAGES = (Stage.FAILED, Stage.PRUNED, Stage.STOPPED, Stage.SUCCEEDED)
+_GC_EVERY_N_EXPERIMENTS = 10
+
 
 class CustomBuildConfig(BuildConfig):
     def __init__(self, *args, packages, **kwargs):
@@ -68,6 +78,7 @@ class Sweep(LightningFlow, ControllerResource):
         pip_install_source: bool = False,
         artifacts_path: Optional[str] = None,
         data: Optional[List[Tuple[str, str]]] = None,
+        gc_after_experiment: bool = False,
         **objective_kwargs: Any,
     ):
         """The Sweep class enables to easily run a Python Script with Lightning
@@ -82,6 +93,8 @@ class Sweep(LightningFlow, ControllerResource):
             blocking: Whether the Work should be blocking or asynchronous.
             script_path: Path of the python script to run.
             logger: Which logger to use
+            gc_after_experiment: Whether to drop the objective of each finished experiment and periodically run
+                garbage collection, to bound the memory of long sweeps.
             objective_kwargs: Your custom keywords arguments passed to your custom objective work class.
         """
         super().__init__()
@@ -89,7 +102,7 @@ class Sweep(LightningFlow, ControllerResource):
         distributions = apply_to_collection(distributions, Distribution, lambda x: x.to_dict())
 
         # SweepConfig
-        self.sweep_id = sweep_id or str(uuid.uuid4()).split("-")[0]
+        self.sweep_id = sweep_id or secrets.token_hex(4)
         self.script_path = script_path
         self.total_experiments = total_experiments
         self.parallel_experiments = parallel_experiments
@@ -113,14 +126,24 @@ class Sweep(LightningFlow, ControllerResource):
         self.data = data
 
         self._objective_cls = _resolve_objective_cls(objective_cls, framework)
-        self._algorithm = algorithm or OptunaAlgorithm(direction=direction)
-        self._logger = LoggerType(logger).get_logger()
+        # Only a named sweep can be resumed, a generated id would leave a new database behind on every launch.
+        self._algorithm = algorithm or OptunaAlgorithm(
+            direction=direction,
+            storage=_sqlite_storage(sweep_id) if sweep_id else None,
+            study_name=sweep_id,
+        )
+        # Loggers keep per-sweep state, so only the class lookup is cached.
+        self._logger = _resolve_logger_cls(logger)()
         self._logger.connect(self)
 
+        # Split once here, every objective then gets its own copy to append its params to.
+        if isinstance(script_args, str):
+            script_args = script_args.split(" ")
+        self._base_script_args = tuple(script_args or ())
+
         self._kwargs = {
             "script_path": script_path,
             "env": env,
-            "script_args": script_args,
             "num_nodes": getattr(cloud_compute, "count", 1) if cloud_compute else 1,
             "artifacts_path": artifacts_path,
             "logger": logger,
@@ -132,123 +155,202 @@ class Sweep(LightningFlow, ControllerResource):
         }
         self._algorithm.register_distributions(self.distributions)
         self._algorithm.register_experiments(
-            [t for t in experiments.values() if t["stage"] == Stage.SUCCEEDED] if experiments else []
+            experiment for experiment in self.experiments.values() if experiment["stage"] == Stage.SUCCEEDED
         )
         self.restart_count = 0
+        self.ws = structures.Dict()
+        self.gc_after_experiment = gc_after_experiment
+        self._num_released = 0
+
+        # Experiments currently running, the unfinished ones to resume first and the next never launched id.
+        self._active: Set[int] = set()
+        self._next_experiment_id = max(self.experiments, default=-1) + 1
+        self._pending: Deque[int] = deque(
+            experiment_id
+            for experiment_id in range(self._next_experiment_id)
+            if self.experiments.get(experiment_id, {}).get("stage") not in _FINISHED_STAGES
+        )
+        # Number of reports already handed to the algorithm, per experiment.
+        self._num_reports: Dict[int, int] = {}
+        # Counted as they fail, so telling whether the whole sweep failed doesn't scan every experiment.
+        self._num_failed = sum(experiment["stage"] == Stage.FAILED for experiment in self.experiments.values())
+        # Compared against instead of the `logger_url` state, which rarely changes.
+        self._last_logger_url = logger_url
+
+        # Best score and path among the succeeded experiments, updated as they finish.
+        self._best_model_score: Optional[float] = None
+        self._best_model_path: Optional[Path] = None
+        for experiment in self.experiments.values():
+            if experiment["stage"] == Stage.SUCCEEDED:
+                self._update_best_model(experiment["best_model_score"], experiment["best_model_path"])
 
     def run(self):
-        if self.stage in (Stage.SUCCEEDED, Stage.STOPPED):
+        if self.stage in (Stage.SUCCEEDED, Stage.STOPPED, Stage.FAILED):
             return
 
-        if self.total_experiments_done == self.total_experiments:
+        # Failed experiments aren't counted as done, the sweep still ends once none is left to run.
+        if self.total_experiments_done == self.total_experiments or not (self._active or self._has_pending):
             self.stage = Stage.SUCCEEDED
             return
 
-        for experiment_id in range(self.num_experiments):
-            objective = self._get_objective(experiment_id)
+        # Fill any free slot right away, so a slow experiment doesn't hold back the others.
+        launched = []
+        while self._has_pending and len(self._active) < self.parallel_experiments:
+            experiment_id = self._pop_pending()
+            if self._launch_experiment(experiment_id):
+                launched.append(experiment_id)
+
+        if launched:
+            # Resumed experiments keep the params they were launched with.
+            recorded_params = {
+                experiment_id: self.experiments[experiment_id]["params"]
+                for experiment_id in launched
+                if self.experiments[experiment_id]["params"]
+            }
+            params = self._algorithm.batched_experiment_start(launched, recorded_params)
+            for experiment_id in launched:
+                self._logger.on_after_experiment_start(self.sweep_id)
+                if not self.experiments[experiment_id]["params"]:
+                    self.experiments[experiment_id]["params"] = params[experiment_id]
 
-            if objective:
-                if _check_stage(objective, Stage.NOT_STARTED):
-                    self._algorithm.experiment_start(experiment_id)
-                    self._logger.on_after_experiment_start(self.sweep_id)
+        for experiment_id in sorted(self._active):
+            self._run_experiment(experiment_id)
 
-                if not self.experiments[experiment_id]["params"]:
-                    self.stage = Stage.RUNNING
-                    self.experiments[experiment_id]["params"] = self._algorithm.get_params(experiment_id)
-
-                logger_url = self._logger.get_url(experiment_id)
-                if logger_url is not None and self.logger_url != logger_url:
-                    self.logger_url = logger_url
-
-                objective.run(
-                    params=self._algorithm.get_params(experiment_id),
-                    restart_count=self.restart_count,
-                )
-
-                if _check_stage(objective, Stage.PENDING):
-                    self.experiments[experiment_id]["stage"] = Stage.PENDING
-                    continue
-
-                if self.experiments[experiment_id]["stage"] in (
-                    Stage.FAILED,
-                    Stage.PRUNED,
-                    Stage.STOPPED,
-                    Stage.SUCCEEDED,
-                ):
-                    continue
-
-                self.experiments[experiment_id]["progress"] = objective.progress
-                self.experiments[experiment_id]["total_parameters"] = getattr(objective, "total_parameters", None)
-                self.experiments[experiment_id]["start_time"] = getattr(objective, "start_time", None)
-                self.experiments[experiment_id]["end_time"] = getattr(objective, "end_time", None)
-                self.experiments[experiment_id]["best_model_score"] = getattr(objective, "best_model_score", None)
-                self.experiments[experiment_id]["last_model_path"] = str(getattr(objective, "last_model_path", ""))
-                self.experiments[experiment_id]["monitor"] = str(getattr(objective, "monitor", ""))
-
-                if _check_stage(objective, Stage.FAILED):
-                    self.experiments[experiment_id]["stage"] = Stage.FAILED
-                    self.experiments[experiment_id]["exception"] = objective.status.message
-                    self.experiments[experiment_id]["end_time"] = str(time.time())
-                    objective.stop()
-
-                if objective.reports:
-                    if self._algorithm.should_prune(experiment_id, objective.reports):
-                        self.experiments[experiment_id]["stage"] = Stage.PRUNED
-                        objective.stop()
-                        self.total_experiments_done += 1
-                        continue
-
-                if self.check_finished_experiment(objective):
-                    self._algorithm.experiment_end(experiment_id, objective.best_model_score)
-                    self._logger.on_after_experiment_end(
-                        sweep_id=self.sweep_id,
-                        experiment_id=objective.experiment_id,
-                        monitor=objective.monitor,
-                        score=objective.best_model_score,
-                        params=self._algorithm.get_params(experiment_id),
-                    )
-                    self.experiments[experiment_id]["best_model_score"] = objective.best_model_score
-                    self.experiments[experiment_id]["best_model_path"] = str(objective.best_model_path)
-                    self.experiments[experiment_id]["monitor"] = objective.monitor
-                    self.experiments[experiment_id]["stage"] = Stage.SUCCEEDED
+        if self.experiments and self._num_failed == len(self.experiments):
+            self.stage = Stage.FAILED
+
+    @property
+    def _has_pending(self) -> bool:
+        return bool(self._pending) or self._next_experiment_id < self.total_experiments
+
+    def _pop_pending(self) -> int:
+        if self._pending:
+            return self._pending.popleft()
+        self._next_experiment_id += 1
+        return self._next_experiment_id - 1
+
+    def _launch_experiment(self, experiment_id: int) -> bool:
+        objective = self._get_objective(experiment_id)
+        if objective is None:
+            return False
+
+        self.stage = Stage.RUNNING
+        self._active.add(experiment_id)
+        return True
+
+    def _run_experiment(self, experiment_id: int) -> None:
+        objective = self._get_objective(experiment_id)
+        params = self.experiments[experiment_id]["params"]
+
+        logger_url = self._logger.get_url(experiment_id)
+        if logger_url is not None and self._last_logger_url != logger_url:
+            self.logger_url = self._last_logger_url = logger_url
+
+        objective.run(params=params, restart_count=self.restart_count)
+        stages = _get_stages(objective)
+
+        if Stage.PENDING in stages:
+            self.experiments[experiment_id]["stage"] = Stage.PENDING
+            return
+
+        self.experiments[experiment_id]["progress"] = objective.progress
+        self.experiments[experiment_id]["total_parameters"] = getattr(objective, "total_parameters", None)
+        self.experiments[experiment_id]["start_time"] = getattr(objective, "start_time", None)
+        self.experiments[experiment_id]["end_time"] = getattr(objective, "end_time", None)
+        self.experiments[experiment_id]["best_model_score"] = getattr(objective, "best_model_score", None)
+        self.experiments[experiment_id]["last_model_path"] = str(getattr(objective, "last_model_path", ""))
+        self.experiments[experiment_id]["monitor"] = str(getattr(objective, "monitor", ""))
+
+        if Stage.FAILED in stages:
+            self.experiments[experiment_id]["stage"] = Stage.FAILED
+            self._num_failed += 1
+            self.experiments[experiment_id]["exception"] = objective.status.message
+            self.experiments[experiment_id]["end_time"] = str(time.time())
+            self._release_experiment(experiment_id, objective)
+            return
+
+        # Only the reports received since the last tick are handed to the algorithm.
+        reports = objective.reports
+        last_num_reports = self._num_reports.get(experiment_id, 0)
+        if len(reports) != last_num_reports:
+            self._num_reports[experiment_id] = len(reports)
+            for value, step in reports[last_num_reports:]:
+                if self._algorithm.should_prune_step(experiment_id, step, value):
+                    self.experiments[experiment_id]["stage"] = Stage.PRUNED
                     self.total_experiments_done += 1
-                    objective.stop()
+                    self._release_experiment(experiment_id, objective)
+                    return
+
+        if self.check_finished_experiment(objective):
+            self._algorithm.experiment_end(experiment_id, objective.best_model_score)
+            self._logger.on_after_experiment_end(
+                sweep_id=self.sweep_id,
+                experiment_id=objective.experiment_id,
+                monitor=objective.monitor,
+                score=objective.best_model_score,
+                params=params,
+            )
+            self.experiments[experiment_id]["best_model_score"] = objective.best_model_score
+            self.experiments[experiment_id]["best_model_path"] = str(objective.best_model_path)
+            self.experiments[experiment_id]["monitor"] = objective.monitor
+            self.experiments[experiment_id]["stage"] = Stage.SUCCEEDED
+            self._update_best_model(objective.best_model_score, objective.best_model_path)
+            self.total_experiments_done += 1
+            self._release_experiment(experiment_id, objective)
 
-        if all(
-            self.experiments[experiment_id]["stage"] == Stage.FAILED for experiment_id in range(self.num_experiments)
-        ):
-            self.stage = Stage.FAILED
+    def _release_experiment(self, experiment_id: int, objective) -> None:
+        objective.stop()
+        self._active.discard(experiment_id)
+        self._algorithm.experiment_released(experiment_id)
+
+        if not self.gc_after_experiment:
+            return
+
+        # Drop the finished objective so the sweep memory is bounded by the parallel experiments.
+        del self.ws[str(experiment_id)]
+        self._num_released += 1
+        if self._num_released % _GC_EVERY_N_EXPERIMENTS == 0:
+            gc.collect()
 
     def stop(self):
-        for experiment_id in range(self.num_experiments):
-            if experiment_id in self.experiments:
-                if self.experiments[experiment_id]["stage"] not in (Stage.STOPPED, Stage.SUCCEEDED, Stage.FAILED):
-                    self.experiments[experiment_id]["stage"] = Stage.STOPPED
-                    if self.experiments[experiment_id]["start_time"] is not None:
-                        self.experiments[experiment_id]["end_time"] = str(time.time())
+        for experiment in self.experiments.values():
+            if experiment["stage"] not in (Stage.STOPPED, Stage.SUCCEEDED, Stage.FAILED):
+                experiment["stage"] = Stage.STOPPED
+                if experiment["start_time"] is not None:
+                    experiment["end_time"] = str(time.time())
         for work in self.works():
             work.stop()
+        self._active.clear()
         self.stage = Stage.STOPPED
 
     @property
     def num_experiments(self) -> int:
-        return min(self.total_experiments_done + self.parallel_experiments, self.total_experiments)
+        """Number of experiments launched so far."""
+        return len(self.experiments)
 
     @property
     def best_model_score(self) -> Optional[float]:
-        return get_best_model_score(self)
+        return self._best_model_score
 
     @property
     def best_model_path(self) -> Optional[Path]:
-        return get_best_model_path(self)
+        return self._best_model_path
+
+    def _update_best_model(self, score: Optional[float], path: Optional[Path]) -> None:
+        if score is not None and (self._best_model_score is None or score > self._best_model_score):
+            self._best_model_score = score
+            self._best_model_path = path
 
     def stop_experiment(self, experiment_id: int):
         objective = self._get_objective(experiment_id)
         if objective:
             objective.stop()
+            if self.experiments[experiment_id]["stage"] == Stage.FAILED:
+                self._num_failed -= 1
             self.experiments[experiment_id]["stage"] = Stage.STOPPED
             self.experiments[experiment_id]["end_time"] = str(time.time())
             self.total_experiments_done += 1
+            self._active.discard(experiment_id)
 
     def check_finished_experiment(self, objective) -> bool:
         if isinstance(objective, LightningFlow) and not getattr(objective, "start_time", None):
@@ -278,7 +380,10 @@ class Sweep(LightningFlow, ControllerResource):
         if experiment_config["stage"] == Stage.SUCCEEDED:
             return
 
-        objective = getattr(self, f"w_{experiment_id}", None)
+        if self.gc_after_experiment and experiment_config["stage"] in _FINISHED_STAGES:
+            return
+
+        objective = self.ws.get(str(experiment_id))
         if objective is None:
             cloud_compute = CloudCompute(
                 name=self.cloud_compute if self.cloud_compute else "cpu",
@@ -290,11 +395,12 @@ class Sweep(LightningFlow, ControllerResource):
                 experiment_id=experiment_id,
                 experiment_name=experiment_config["name"],
                 cloud_compute=cloud_compute,
+                script_args=list(self._base_script_args),
                 last_model_path=experiment_config["last_model_path"],
                 pip_install_source=self.pip_install_source,
                 **self._kwargs,
             )
-            setattr(self, f"w_{experiment_id}", objective)
+            self.ws[str(experiment_id)] = objective
             self.experiments[experiment_id]["stage"] = Stage.PENDING
 
             # TODO: Remove when display name is merged
@@ -315,15 +421,25 @@ class Sweep(LightningFlow, ControllerResource):
     def from_config(
         cls, config: SweepConfig, code: Optional[Code] = None, data: Optional[List[Tuple[str, str]]] = None
     ):
+        # Convert the nested models to dicts in one pass and share the result.
+        nested = config.dict(include={"distributions", "experiments"})
+        distributions, experiments = nested["distributions"], nested["experiments"]
+
         if config.algorithm == "grid_search":
-            algorithm = GridSearch({k: v.dict()["params"]["choices"] for k, v in config.distributions.items()})
+            algorithm = GridSearch({k: v["params"]["choices"] for k, v in distributions.items()})
             config.total_experiments = algorithm.total_experiments
             config.parallel_experiments = algorithm.total_experiments
 
         elif config.algorithm == "random_search":
-            algorithm = RandomSearch({k: v.dict() for k, v in config.distributions.items()})
+            algorithm = RandomSearch(distributions)
+        elif config.algorithm == "asha":
+            algorithm = ASHAPruner(
+                direction=config.direction, storage=_sqlite_storage(config.sweep_id), study_name=config.sweep_id
+            )
         else:
-            algorithm = OptunaAlgorithm(direction=config.direction)
+            algorithm = OptunaAlgorithm(
+                direction=config.direction, storage=_sqlite_storage(config.sweep_id), study_name=config.sweep_id
+            )
 
         return cls(
             script_path=config.script_path,
@@ -332,7 +448,7 @@ class Sweep(LightningFlow, ControllerResource):
             framework=config.framework,
             script_args=config.script_args,
             total_experiments_done=config.total_experiments_done,
-            distributions={k: v.dict() for k, v in config.distributions.items()},
+            distributions=distributions,
             cloud_compute=HPOCloudCompute(
                 config.cloud_compute,
                 count=config.num_nodes,
@@ -343,7 +459,7 @@ class Sweep(LightningFlow, ControllerResource):
             code=code,
             logger=config.logger,
             algorithm=algorithm,
-            experiments={k: v.dict() for k, v in config.experiments.items()},
+            experiments=experiments,
             direction=config.direction,
             stage=config.stage,
             logger_url=config.logger_url,
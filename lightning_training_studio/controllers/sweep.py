@@ -5,6 +5,7 @@ from lightning.app.storage import Drive
 from lightning.app.structures import Dict
 
 from lightning_training_studio import Sweep
+from lightning_training_studio.algorithm.optuna import _delete_sqlite_storage
 from lightning_training_studio.commands.data.create import DataConfig
 from lightning_training_studio.commands.experiment.delete import DeleteExperimentCommand, DeleteExperimentConfig
 from lightning_training_studio.commands.experiment.run import RunExperimentCommand
@@ -115,6 +116,8 @@ class SweepController(Controller):
                     sweep = sweep.collect_model()
                     del self.r[config.name]
                 self.db.delete(sweep)
+                # A new sweep reusing this name must not resume the deleted study.
+                _delete_sqlite_storage(config.name)
                 for tensorboard in self.db.select_all(TensorboardConfig):
                     if tensorboard.sweep_id == config.name:
                         tensorboard.desired_stage = Stage.DELETED
@@ -140,6 +143,7 @@ class SweepController(Controller):
                         sweep = sweep.collect_model()
                         del self.r[config.name]
                     self.db.delete(sweep)
+                    _delete_sqlite_storage(config.name)
                     for tensorboard in self.db.select_all(TensorboardConfig):
                         if tensorboard.sweep_id == config.name:
                             tensorboard.desired_stage = Stage.DELETED
@@ -18,7 +18,7 @@ class TensorboardController(Controller):
         for config in configs:
             work_name = urllib.parse.quote_plus(config.sweep_id)
             if work_name not in self.r:
-                if config.stage in (Stage.STOPPED, Stage.NOT_STARTED) and config.desired_stage == Stage.RUNNING:
+                if config.desired_stage == Stage.RUNNING and config.stage in (Stage.STOPPED, Stage.NOT_STARTED):
                     self.r[work_name] = Tensorboard(
                         drive=Drive(f"lit://{config.sweep_id}"),
                         config=config,
@@ -64,13 +64,13 @@ class TensorboardController(Controller):
         # TODO: Move to delete once merged.
         work = self.r[work_name]
         if getattr(work._backend, "delete_work", None):
-            self.r[work_name].delete()
+            work.delete()
         else:
-            self.r[work_name].stop()
-        self.r[work_name]._url = ""
-        self.r[work_name].stage = Stage.STOPPED
-        self.r[work_name].desired_stage = Stage.STOPPED
-        self.db.update(self.r[work_name].collect_model())
+            work.stop()
+        work._url = ""
+        work.stage = Stage.STOPPED
+        work.desired_stage = Stage.STOPPED
+        self.db.update(work.collect_model())
         del self.r[work_name]
 
     def stop_tensorboard(self, config: StopTensorboardConfig):
@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import Type
 
 from lightning_training_studio.loggers.logger import Logger, NoneLogger
 from lightning_training_studio.loggers.streamlit.streamlit import StreamLitLogger
@@ -13,13 +14,16 @@ class LoggerType(Enum):
     NONE = "none"
 
     def get_logger(self) -> Logger:
+        return self.get_logger_cls()()
+
+    def get_logger_cls(self) -> Type[Logger]:
         if self == LoggerType.NONE:
-            return NoneLogger()
+            return NoneLogger
         if self == LoggerType.STREAMLIT:
-            return StreamLitLogger()
+            return StreamLitLogger
         elif self == LoggerType.WANDB:
-            return WandbLogger()
+            return WandbLogger
         elif self == LoggerType.TENSORBOARD:
-            return TensorboardLogger()
+            return TensorboardLogger
         else:
             raise ValueError("Unknown runtime type")
@@ -1,7 +1,7 @@
 import functools
 import json
 from dataclasses import dataclass
-from typing import Generic, Optional, Type, TypeVar, Union
+from typing import Generic, Optional, Set, Type, TypeVar, Union
 
 from fastapi.encoders import jsonable_encoder
 from lightning import CloudCompute as LightningCloudCompute
@@ -15,6 +15,7 @@ from sqlmodel import JSON, SQLModel, TypeDecorator
 
 from lightning_training_studio.framework import _OBJECTIVE_FRAMEWORK
 from lightning_training_studio.framework.agnostic import Objective
+from lightning_training_studio.loggers import Logger, LoggerType
 
 T = TypeVar("T")
 
@@ -39,6 +40,7 @@ def get_best_model_path(flow: LightningFlow) -> Optional[Path]:
     return metrics[max(metrics)].best_model_path
 
 
+@functools.lru_cache
 def _resolve_objective_cls(objective_cls, framework: str):
     if objective_cls is None:
         if framework not in _OBJECTIVE_FRAMEWORK:
@@ -48,15 +50,20 @@ def _resolve_objective_cls(objective_cls, framework: str):
     return objective_cls
 
 
-def _check_stage(obj: Union[LightningFlow, Objective], status: str) -> bool:
+@functools.lru_cache
+def _resolve_logger_cls(logger: str) -> Type[Logger]:
+    return LoggerType(logger).get_logger_cls()
+
+
+def _get_stages(obj: Union[LightningFlow, Objective]) -> Set[str]:
     if isinstance(obj, Objective):
-        return obj.status.stage == status
+        return {obj.status.stage}
     else:
         works = obj.works()
         if works:
-            return any(w.status.stage == status for w in obj.works())
+            return {w.status.stage for w in works}
         else:
-            return status == WorkStageStatus.NOT_STARTED
+            return {WorkStageStatus.NOT_STARTED}
 
 
 # Taken from https://github.com/tiangolo/sqlmodel/issues/63#issuecomment-1081555082
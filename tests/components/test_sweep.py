@@ -1,9 +1,13 @@
+import os
 from typing import Any, Dict
 from unittest.mock import MagicMock
 
 import optuna
+import pytest
 
-from lightning_training_studio.algorithm import OptunaAlgorithm
+from lightning_training_studio.algorithm import ASHAPruner, OptunaAlgorithm
+from lightning_training_studio.algorithm.base import Algorithm
+from lightning_training_studio.commands.sweep.run import ExperimentConfig
 from lightning_training_studio.components.sweep import Sweep
 from lightning_training_studio.distributions import Categorical, Uniform
 from lightning_training_studio.utilities.enum import Stage
@@ -28,6 +32,32 @@ def test_sweep_with_failed_experiments():
     assert sweep.experiments[0]["stage"] == "failed"
 
 
+def test_sweep_stop_marks_every_running_experiment_stopped():
+    experiments = {
+        0: ExperimentConfig(name="a", stage=Stage.FAILED, params={"best_model_score": 1}),
+        1: ExperimentConfig(name="b", stage=Stage.SUCCEEDED, params={"best_model_score": 2}, best_model_score=2),
+        2: ExperimentConfig(name="c", stage=Stage.RUNNING, params={"best_model_score": 3}),
+        3: ExperimentConfig(name="d", stage=Stage.PENDING, params={"best_model_score": 4}),
+    }
+    sweep = Sweep(
+        total_experiments=4,
+        parallel_experiments=2,
+        objective_cls=MockObjective,
+        distributions={"best_model_score": Uniform(0, 10)},
+        experiments={k: v.dict() for k, v in experiments.items()},
+        total_experiments_done=1,
+    )
+
+    sweep.stop()
+    assert sweep.num_experiments == 4
+    assert [sweep.experiments[idx]["stage"] for idx in range(4)] == [
+        Stage.FAILED,
+        Stage.SUCCEEDED,
+        Stage.STOPPED,
+        Stage.STOPPED,
+    ]
+
+
 class PrunedMockObjective(MockObjective):
     def run(self, params: Dict[str, Any], restart_count: int):
         score = params["best_model_score"]
@@ -99,3 +129,281 @@ def test_sweep_stop():
     assert sweep.experiments[0]["stage"] == "stopped"
     assert sweep.experiments[0]["end_time"] is None
     assert sweep.stage == "stopped"
+
+
+class SlowFirstMockObjective(MockObjective):
+    def run(self, params: Dict[str, Any], restart_count: int):
+        if self.experiment_id == 0:
+            self.params = params
+            self._backend = MagicMock()
+            return
+        super().run(params, restart_count)
+
+
+def test_sweep_launches_experiment_when_slot_frees():
+    sweep = Sweep(
+        total_experiments=4,
+        parallel_experiments=2,
+        objective_cls=SlowFirstMockObjective,
+        distributions={"best_model_score": Uniform(0, 10)},
+    )
+
+    for _ in range(4):
+        sweep.run()
+
+    assert sweep.experiments[0]["stage"] != Stage.SUCCEEDED
+    assert all(sweep.experiments[idx]["stage"] == Stage.SUCCEEDED for idx in range(1, 4))
+    assert sweep.total_experiments_done == 3
+
+
+def test_sweep_pruned_asha():
+    sweep = Sweep(
+        total_experiments=10,
+        objective_cls=PrunedMockObjectiveSuperRun,
+        distributions={
+            "best_model_score": Uniform(0, 10),
+        },
+        algorithm=ASHAPruner(
+            study=optuna.create_study(direction="maximize", sampler=optuna.samplers.RandomSampler(seed=0)),
+        ),
+    )
+
+    for _ in range(11):
+        sweep.run()
+
+    assert sweep.stage == Stage.SUCCEEDED
+    assert "pruned" in {v["stage"] for k, v in sweep.experiments.items()}
+
+
+def test_asha_pruner_only_checks_rungs():
+    algorithm = ASHAPruner(eta=2, min_r=2, max_r=8, direction="minimize")
+    assert algorithm.rung_steps == [2, 4, 8]
+
+    assert not algorithm.should_prune(0, [(1.0, 0)])
+    assert not algorithm.should_prune(0, [(1.0, 0), (1.0, 1)])
+    assert not algorithm.should_prune(1, [(5.0, 0), (0.5, 1)])
+    assert algorithm.should_prune(2, [(5.0, 0), (5.0, 1), (5.0, 2), (5.0, 3)])
+    assert algorithm.rungs[0] == [0.5, 1.0, 5.0]
+
+
+def test_asha_pruner_prunes_step_by_step():
+    algorithm = ASHAPruner(eta=2, min_r=2, max_r=8, direction="minimize")
+
+    assert not algorithm.should_prune_step(0, 0, 1.0)
+    assert not algorithm.should_prune_step(0, 1, 1.0)
+    assert not algorithm.should_prune_step(1, 0, 5.0)
+    assert not algorithm.should_prune_step(1, 1, 0.5)
+    assert not algorithm.should_prune_step(2, 0, 5.0)
+    assert algorithm.should_prune_step(2, 1, 5.0)
+    assert algorithm.rungs[0] == [0.5, 1.0, 5.0]
+
+
+def test_should_prune_step_passes_the_report_history():
+    class CountingAlgorithm(OptunaAlgorithm):
+        should_prune_step = Algorithm.should_prune_step
+
+        def should_prune(self, experiment_id, reports):
+            return len(reports) == 3
+
+    algorithm = CountingAlgorithm()
+    assert not algorithm.should_prune_step(0, 0, 1.0)
+    assert not algorithm.should_prune_step(0, 1, 1.0)
+    assert not algorithm.should_prune_step(1, 0, 1.0)
+    assert algorithm.should_prune_step(0, 2, 1.0)
+
+    algorithm.experiment_released(0)
+    assert list(algorithm._reports_history) == [1]
+
+
+def test_sweep_starts_experiments_in_batch():
+    algorithm = OptunaAlgorithm(direction="maximize")
+    algorithm.batched_experiment_start = MagicMock(wraps=algorithm.batched_experiment_start)
+    sweep = Sweep(
+        total_experiments=5,
+        parallel_experiments=3,
+        objective_cls=MockObjective,
+        distributions={"best_model_score": Uniform(0, 10)},
+        algorithm=algorithm,
+    )
+
+    sweep.run()
+    algorithm.batched_experiment_start.assert_called_once_with([0, 1, 2], {})
+    assert all(sweep.experiments[idx]["params"] for idx in range(3))
+
+
+def test_sweep_best_model():
+    sweep = Sweep(
+        total_experiments=4,
+        parallel_experiments=2,
+        objective_cls=MockObjective,
+        distributions={
+            "best_model_score": Uniform(0, 100),
+            "best_model_path": Categorical(choices=["a", "b", "c"]),
+        },
+    )
+    assert sweep.best_model_score is None
+    assert sweep.best_model_path is None
+
+    for _ in range(4):
+        sweep.run()
+
+    best = max(sweep.experiments.values(), key=lambda experiment: experiment["best_model_score"])
+    assert sweep.best_model_score == best["best_model_score"]
+    assert sweep.best_model_path == best["best_model_path"]
+
+
+def test_sweep_registers_succeeded_experiments():
+    experiments = {
+        idx: ExperimentConfig(
+            name=str(idx),
+            stage=Stage.SUCCEEDED if idx % 2 else Stage.FAILED,
+            params={"x": idx / 1000},
+            best_model_score=idx,
+        ).dict()
+        for idx in range(600)
+    }
+    algorithm = OptunaAlgorithm(direction="maximize")
+    Sweep(
+        total_experiments=600,
+        objective_cls=MockObjective,
+        distributions={"x": Uniform(0, 1)},
+        algorithm=algorithm,
+        experiments=experiments,
+    )
+    assert len(algorithm.study.trials) == 300
+    assert algorithm.study.best_value == 599
+
+
+def test_sweep_resumes_persisted_study():
+    experiments = {
+        idx: ExperimentConfig(
+            name=str(idx),
+            stage=Stage.SUCCEEDED,
+            params={"x": idx / 10},
+            best_model_score=idx,
+        ).dict()
+        for idx in range(5)
+    }
+    kwargs = dict(
+        total_experiments=5,
+        objective_cls=MockObjective,
+        distributions={"x": Uniform(0, 1)},
+        direction="maximize",
+        experiments=experiments,
+        sweep_id="resumed",
+    )
+    assert len(Sweep(**kwargs)._algorithm.study.trials) == 5
+
+    # The restarted sweep loads the study from its storage rather than registering the experiments again.
+    sweep = Sweep(**kwargs)
+    assert len(sweep._algorithm.study.trials) == 5
+    assert sweep._algorithm.study.best_value == 4
+
+    with pytest.raises(ValueError, match="can't be resumed to minimize"):
+        Sweep(**{**kwargs, "direction": "minimize"})
+
+
+def test_sweep_without_id_keeps_its_study_in_memory():
+    sweep = Sweep(total_experiments=1, objective_cls=MockObjective, distributions={"x": Uniform(0, 1)})
+    assert not os.path.exists(".lhpo")
+    assert sweep._algorithm.study.trials == []
+
+
+def test_sweep_study_storage_stays_in_its_directory():
+    sweep = Sweep(
+        total_experiments=1,
+        objective_cls=MockObjective,
+        distributions={"x": Uniform(0, 1)},
+        sweep_id="../a/b",
+    )
+    assert sweep._algorithm.study.study_name == "../a/b"
+    assert os.path.isfile(os.path.join(".lhpo", "..%2Fa%2Fb.db"))
+    assert not os.path.exists("a")
+
+
+def test_sweep_resumes_unfinished_experiments_first():
+    experiments = {
+        0: ExperimentConfig(name="a", stage=Stage.SUCCEEDED, params={"best_model_score": 1}, best_model_score=1),
+        1: ExperimentConfig(name="b", stage=Stage.RUNNING, params={"best_model_score": 2}),
+    }
+    sweep = Sweep(
+        total_experiments=3,
+        objective_cls=MockObjective,
+        distributions={"best_model_score": Uniform(0, 10)},
+        experiments={k: v.dict() for k, v in experiments.items()},
+        total_experiments_done=1,
+    )
+
+    sweep.run()
+    assert sweep.experiments[1]["stage"] == Stage.SUCCEEDED
+    assert sweep.experiments[1]["params"] == {"best_model_score": 2}
+    assert 2 not in sweep.experiments
+    # The study records the score of the resumed experiment against the params it actually ran with.
+    assert sweep._algorithm.study.trials[-1].params == {"best_model_score": 2}
+    assert sweep._algorithm.study.trials[-1].value == 2
+
+    sweep.run()
+    assert sweep.experiments[2]["stage"] == Stage.SUCCEEDED
+    assert sweep.total_experiments_done == 3
+
+
+def test_sweep_gc_after_experiment():
+    sweep = Sweep(
+        total_experiments=4,
+        parallel_experiments=2,
+        objective_cls=MockObjective,
+        distributions={"best_model_score": Uniform(0, 10)},
+        gc_after_experiment=True,
+    )
+
+    for _ in range(3):
+        sweep.run()
+
+    assert sweep.total_experiments_done == 4
+    assert len(sweep.ws) == 0
+    assert sweep.best_model_score == max(v["best_model_score"] for v in sweep.experiments.values())
+
+
+def test_sweep_failed_when_all_experiments_failed():
+    sweep = Sweep(
+        2,
+        parallel_experiments=2,
+        objective_cls=FailedMockObjective,
+        distributions={
+            "best_model_score": Uniform(0, 100),
+            "best_model_path": Categorical(choices=["a", "b"]),
+        },
+    )
+
+    sweep.run()
+    assert sweep._num_failed == 2
+    assert sweep.stage == Stage.FAILED
+
+
+class SecondFailedMockObjective(MockObjective):
+    def on_after_run(self):
+        if self.experiment_id == 1:
+            FailedMockObjective.on_after_run(self)
+        else:
+            super().on_after_run()
+
+
+def test_sweep_succeeds_when_some_experiments_failed():
+    sweep = Sweep(
+        4,
+        parallel_experiments=1,
+        objective_cls=SecondFailedMockObjective,
+        distributions={"best_model_score": Uniform(0, 100)},
+    )
+
+    for _ in range(5):
+        sweep.run()
+
+    assert [sweep.experiments[idx]["stage"] for idx in range(4)] == [
+        Stage.SUCCEEDED,
+        Stage.FAILED,
+        Stage.SUCCEEDED,
+        Stage.SUCCEEDED,
+    ]
+    assert sweep.total_experiments_done == 3
+    assert sweep.stage == Stage.SUCCEEDED
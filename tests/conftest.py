@@ -52,6 +52,7 @@ def cleanup():
     shutil.rmtree("./storage", ignore_errors=True)
     shutil.rmtree(_storage_root_dir(), ignore_errors=True)
     shutil.rmtree("./.shared", ignore_errors=True)
+    shutil.rmtree("./.lhpo", ignore_errors=True)
     if os.path.isfile(_APP_CONFIG_FILENAME):
         os.remove(_APP_CONFIG_FILENAME)
     _set_context(None)
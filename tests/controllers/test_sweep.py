@@ -1,6 +1,7 @@
 import os
 from unittest.mock import MagicMock
 
+from lightning_training_studio.algorithm.optuna import _sqlite_storage_path
 from lightning_training_studio.commands.data.create import DataConfig
 from lightning_training_studio.commands.experiment.delete import DeleteExperimentConfig
 from lightning_training_studio.commands.experiment.run import ExperimentConfig
@@ -117,8 +118,10 @@ def test_sweep_controller_delete_sweep(monkeypatch):
 
     tensorboard_configs = tensorboard_controller.db.select_all(TensorboardConfig)
     assert len(tensorboard_configs) == 1
+    assert os.path.exists(_sqlite_storage_path(config.sweep_id))
     delete_config = DeleteSweepConfig(name=config.sweep_id)
     sweep_controller.delete_sweep(delete_config)
+    assert not os.path.exists(_sqlite_storage_path(config.sweep_id))
 
     tensorboard_configs = tensorboard_controller.db.select_all(TensorboardConfig)
     tensorboard_controller.on_reconcile_start(tensorboard_configs)
@@ -142,8 +145,10 @@ def test_sweep_controller_delete_xexperiment(monkeypatch):
     )
     sweep_controller, tensorboard_controller, config = _sweep_controller_setup(monkeypatch, sweep)
 
+    assert os.path.exists(_sqlite_storage_path(config.sweep_id))
     delete_config = DeleteSweepConfig(name=config.sweep_id)
     sweep_controller.delete_experiment(delete_config)
+    assert not os.path.exists(_sqlite_storage_path(config.sweep_id))
 
     tensorboard_configs = tensorboard_controller.db.select_all(TensorboardConfig)
     tensorboard_controller.on_reconcile_start(tensorboard_configs)
@@ -173,6 +178,8 @@ def test_sweep_controller_delete_experiment_from_sweep(monkeypatch):
     delete_config = DeleteExperimentConfig(name=sweeps[0].experiments[0].name)
 
     sweep_controller.delete_experiment(delete_config)
+    # Experiments of a multi-experiment sweep can't be deleted, so the sweep keeps its study.
+    assert os.path.exists(_sqlite_storage_path(config.sweep_id))
 
     tensorboard_configs = tensorboard_controller.db.select_all(TensorboardConfig)
     tensorboard_controller.on_reconcile_start(tensorboard_configs)
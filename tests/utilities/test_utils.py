@@ -29,7 +29,7 @@ def test_score_and_path():
     assert sweep.stage == Stage.RUNNING
     assert len(sweep.experiments) == 3
     assert sweep.experiments[0]["stage"] == Stage.SUCCEEDED
-    assert sweep.w_0.status.stage == Stage.STOPPED
+    assert sweep.ws["0"].status.stage == Stage.STOPPED
 
     best_model_score = get_best_model_score(sweep)
     assert best_model_score == max([w.best_model_score for w in sweep.works()])
@@ -39,7 +39,7 @@ def test_score_and_path():
     sweep.run()
     assert len(sweep.experiments) == 5
     assert sweep.experiments[4]["stage"] == Stage.SUCCEEDED
-    assert sweep.w_4.status.stage == Stage.STOPPED
+    assert sweep.ws["4"].status.stage == Stage.STOPPED
     assert sweep.stage == Stage.RUNNING
 
     best_model_score = get_best_model_score(sweep)